@@ -1,5 +1,5 @@
 import argparse
-import importlib.metadata
+import functools
 import json
 import logging
 import os
@@ -7,14 +7,15 @@ import shutil
 import stat
 import subprocess
 import sys
+import tempfile
 from logging import Logger
 
 from nuki_sesami.error import SesamiArgError
 from nuki_sesami.state import PushbuttonLogic
-from nuki_sesami.util import get_config_path, get_prefix, getlogger, run
+from nuki_sesami.util import get_config_path, get_prefix, get_version, getlogger, run
 
 SYSTEMD_TEMPLATE = """[Unit]
-Description=%s
+Description=%(description)s
 After=network.target
 Wants=Network.target
 
@@ -22,7 +23,7 @@ Wants=Network.target
 Type=simple
 Restart=always
 RestartSec=1
-ExecStart=%s -c %s
+ExecStart=%(prog)s -c %(cpath)s
 StandardError=journal
 StandardOutput=journal
 StandardInput=null
@@ -37,18 +38,47 @@ SYSTEMD_DESCRIPTION = {
 }
 
 
-def get_systemctl(dryrun: bool) -> list[str]:
+@functools.cache
+def get_systemctl(dryrun: bool) -> tuple[str, ...]:
     if dryrun:
-        return ["echo", "/usr/bin/systemctl"]
+        return ("echo", "/usr/bin/systemctl")
     if os.geteuid() == 0:
-        return ["systemctl"]
-    return ["sudo", "systemctl"]
+        return ("systemctl",)
+    return ("sudo", "systemctl")
 
 
 def get_systemd_service_fname(prefix: str, name: str) -> str:
     return os.path.join(prefix, f"lib/systemd/system/{name}.service")
 
 
+def write_json_file(fname: str, obj: dict | list, mode: int) -> None:
+    """Writes an object as (indented) json to file, replacing the file if it exists.
+
+    The json document is written to a temporary file in the same directory
+    first which then is renamed to the given file name; i.e. the file is
+    never observed partially written or with the wrong access permissions.
+    The directory is created when needed.
+
+    Arguments:
+    * fname: str, the file name; e.g. '/etc/nuki-sesami/config.json'
+    * obj: dict | list, the object to be written
+    * mode: int, the file access permissions; e.g. stat.S_IRUSR
+    """
+    d = os.path.dirname(fname)
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(json.dumps(obj, indent=2).encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, fname)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 def create_config_file(logger: Logger, cpath: str, args: argparse.Namespace) -> None:
     """Creates a config file for nuki-sesami services.
 
@@ -70,10 +100,6 @@ def create_config_file(logger: Logger, cpath: str, args: argparse.Namespace) ->
 
     fname = os.path.join(cpath, "config.json")
 
-    d = os.path.dirname(fname)
-    if not os.path.exists(d):
-        os.makedirs(d)
-
     config = {
         "nuki": {"device": args.device},
         "mqtt": {
@@ -93,12 +119,7 @@ def create_config_file(logger: Logger, cpath: str, args: argparse.Namespace) ->
         "lock-unlatch-time": args.lock_unlatch_time,
     }
 
-    if os.path.exists(fname):
-        os.unlink(fname)
-
-    with open(fname, "w+") as f:
-        json.dump(config, f, indent=2)
-    os.chmod(fname, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
+    write_json_file(fname, config, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
     logger.info("created '%s'", fname)
 
 
@@ -123,18 +144,9 @@ def create_auth_file(logger: Logger, cpath: str, username: str, password: str) -
 
     fname = os.path.join(cpath, "auth.json")
 
-    d = os.path.dirname(fname)
-    if not os.path.exists(d):
-        os.makedirs(d)
-
     auth = {"username": username, "password": password}
 
-    if os.path.exists(fname):
-        os.unlink(fname)
-
-    with open(fname, "w+") as f:
-        json.dump(auth, f, indent=2)
-    os.chmod(fname, stat.S_IRUSR)
+    write_json_file(fname, auth, stat.S_IRUSR)
     logger.info("created '%s'", fname)
 
 
@@ -153,44 +165,32 @@ def create_clients_file(logger: Logger, cpath: str) -> None:
     if os.path.exists(fname):
         return
 
-    d = os.path.dirname(fname)
-    if not os.path.exists(d):
-        os.makedirs(d)
-
     clients = [{"macaddr": "00:00:00:00:00:00", "pubkey": ""}]
 
-    with open(fname, "w+") as f:
-        json.dump(clients, f, indent=2)
-    os.chmod(fname, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
+    write_json_file(fname, clients, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
     logger.info("created '%s'", fname)
 
 
-def create_systemd_service(logger: Logger, prefix: str, cpath: str, name: str, dryrun: bool) -> None:
-    """Create and start a systemd service for nuki-sesami.
+def create_systemd_service(logger: Logger, prefix: str, cpath: str, name: str, prog: str, dryrun: bool) -> None:
+    """Create a systemd service file for nuki-sesami.
 
-    Creates the systemd service file, reloads the systemd daemon and
-    starts the service.
+    Creates the systemd service file and, unless in dryrun mode, moves it
+    to the systemd system directory.
 
     Arguments:
     * logger: Logger, the logger
     * prefix: str, the system root; e.g. '/'
     * cpath: str, the configuration path; e.g. '/etc/nuki-sesami'
     * name: str, the service name
+    * prog: str, the full path of the service binary
     * dryrun: bool, if True, the service is not created
     """
-    prog = shutil.which(name)
-    if not prog:
-        logger.error("failed to detect '%s' binary", name)
-        sys.exit(1)
-
     fname = get_systemd_service_fname(prefix, name)
 
-    d = os.path.dirname(fname)
-    if not os.path.exists(d):
-        os.makedirs(d)
+    os.makedirs(os.path.dirname(fname), exist_ok=True)
 
     with open(fname, "w+") as f:
-        f.write(SYSTEMD_TEMPLATE % (SYSTEMD_DESCRIPTION[name], prog, cpath))
+        f.write(SYSTEMD_TEMPLATE % {"description": SYSTEMD_DESCRIPTION[name], "prog": prog, "cpath": cpath})
         logger.info("created '%s'", fname)
 
     if not dryrun:
@@ -200,51 +200,70 @@ def create_systemd_service(logger: Logger, prefix: str, cpath: str, name: str, d
             cmd = ["mv"] if os.geteuid() == 0 else ["sudo", "mv"]
             run([*cmd, "-v", "-f", src, dst], logger, check=True)
 
-    systemctl = get_systemctl(dryrun)
-
-    try:
-        run([*systemctl, "daemon-reload"], logger, check=True)
-        run([*systemctl, "enable", name], logger, check=True)
-        run([*systemctl, "start", name], logger, check=True)
-        logger.info("done")
-    except subprocess.CalledProcessError:
-        logger.exception("failed to install %s systemd service", name)
-        sys.exit(1)
-
 
 def services_install(logger: Logger, prefix: str, cpath: str, args: argparse.Namespace) -> None:
     """Create nuki-sesami config files and installs systemd services.
 
+    The systemd daemon is reloaded once after all service files have been
+    created, after which all services are enabled and started using a single
+    systemctl invocation.
+
     Arguments:
     * logger: Logger, the logger
     * prefix: str, the system root; e.g. '/'
     * cpath: str, the configuration path; e.g. '/etc/nuki-sesami'
     * args: argparse.Namespace, the command line arguments
     """
+    progs = {}
+    for name in SYSTEMD_DESCRIPTION:
+        prog = shutil.which(name)
+        if not prog:
+            logger.error("failed to detect '%s' binary", name)
+            sys.exit(1)
+        progs[name] = prog
+
     create_config_file(logger, cpath, args)
     create_auth_file(logger, cpath, args.username, args.password)
     create_clients_file(logger, cpath)
-    create_systemd_service(logger, prefix, cpath, "nuki-sesami", args.dryrun)
-    create_systemd_service(logger, prefix, cpath, "nuki-sesami-bluez", args.dryrun)
+    for name, prog in progs.items():
+        create_systemd_service(logger, prefix, cpath, name, prog, args.dryrun)
+
+    systemctl = get_systemctl(args.dryrun)
+
+    try:
+        run([*systemctl, "daemon-reload"], logger, check=True)
+        run([*systemctl, "enable", "--now", *progs], logger, check=True)
+        logger.info("done")
+    except subprocess.CalledProcessError:
+        logger.exception("failed to install %s systemd services", ", ".join(progs))
+        sys.exit(1)
 
 
-def systemd_service_remove(logger: Logger, prefix: str, systemctl: list[str], name: str) -> None:
-    """Removes a systemd service."""
-    run([*systemctl, "stop", name], logger, check=False)
-    run([*systemctl, "disable", name], logger, check=False)
+def systemd_service_remove(logger: Logger, prefix: str, name: str) -> None:
+    """Removes a systemd service file."""
     fname = get_systemd_service_fname(prefix, name)
-    run(["/usr/bin/rm", "-vrf", fname], logger, check=False)
+    try:
+        os.unlink(fname)
+        logger.info("removed '%s'", fname)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.exception("failed to remove '%s'", fname)
 
 
 def services_remove(logger: Logger, prefix: str, dryrun: bool) -> None:
-    """Removes all nuki-sesami related systemd services."""
+    """Removes all nuki-sesami related systemd services.
+
+    All services are stopped and disabled using a single systemctl invocation.
+    """
     systemctl = get_systemctl(dryrun)
-    systemd_service_remove(logger, prefix, systemctl, "nuki-sesami")
-    systemd_service_remove(logger, prefix, systemctl, "nuki-sesami-bluez")
+    run([*systemctl, "disable", "--now", *SYSTEMD_DESCRIPTION], logger, check=False)
+    for name in SYSTEMD_DESCRIPTION:
+        systemd_service_remove(logger, prefix, name)
     run([*systemctl, "daemon-reload"], logger, check=True)
 
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="nuki-sesami-admin",
         description="Setup or remove nuki-sesami configuration and systemd services",
@@ -307,8 +326,12 @@ def main():
     parser.add_argument("-V", "--verbose", help="be verbose", action="store_true")
     parser.add_argument("-v", "--version", help="print version and exit", action="store_true")
 
-    args = parser.parse_args()
-    version = importlib.metadata.version("nuki-sesami")
+    return parser
+
+
+def main():
+    args = _build_parser().parse_args()
+    version = get_version()
     if args.version:
         print(version)  # noqa: T201
         sys.exit(0)
@@ -321,25 +344,30 @@ def main():
         os.makedirs(logpath)
 
     logger = getlogger("nuki-sesami-setup", logpath, level=logging.DEBUG if args.verbose else logging.INFO)
-    logger.debug("version           : %s", version)
-    logger.debug("action            : %s", args.action)
-    logger.debug("pushbutton        : %s", PushbuttonLogic[args.pushbutton].name)
-    logger.debug("door-open-time    : %i", args.door_open_time)
-    logger.debug("door-close-time   : %i", args.door_close_time)
-    logger.debug("lock-unlatch-time : %i", args.lock_unlatch_time)
-    logger.debug("nuki.device       : %s", args.device)
-    logger.debug("mqtt.host         : %s", args.host)
-    logger.debug("mqtt.port         : %i", args.port)
-    logger.debug("mqtt.username     : %s", args.username)
-    logger.debug("mqtt.password     : ***")
-    logger.debug("bluetooth.macaddr : %s", args.blue_macaddr)
-    logger.debug("bluetooth.channel : %i", args.blue_channel)
-    logger.debug("bluetooth.backlog : %i", args.blue_backlog)
-    logger.debug("gpio.pushbutton   : %s", args.gpio_pushbutton)
-    logger.debug("gpio.opendoor     : %s", args.gpio_opendoor)
-    logger.debug("gpio.openhold     : %s", args.gpio_openhold)
-    logger.debug("gpio.openclose    : %s", args.gpio_openclose)
-    logger.debug("dryrun            : %s", args.dryrun)
+    logger.debug(
+        "config: %s",
+        {
+            "version": version,
+            "action": args.action,
+            "pushbutton": args.pushbutton,
+            "door-open-time": args.door_open_time,
+            "door-close-time": args.door_close_time,
+            "lock-unlatch-time": args.lock_unlatch_time,
+            "nuki.device": args.device,
+            "mqtt.host": args.host,
+            "mqtt.port": args.port,
+            "mqtt.username": args.username,
+            "mqtt.password": "***",
+            "bluetooth.macaddr": args.blue_macaddr,
+            "bluetooth.channel": args.blue_channel,
+            "bluetooth.backlog": args.blue_backlog,
+            "gpio.pushbutton": args.gpio_pushbutton,
+            "gpio.opendoor": args.gpio_opendoor,
+            "gpio.openhold": args.gpio_openhold,
+            "gpio.openclose": args.gpio_openclose,
+            "dryrun": args.dryrun,
+        },
+    )
 
     try:
         if args.action == "remove":
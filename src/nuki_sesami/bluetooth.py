@@ -2,35 +2,131 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import importlib.metadata
+import functools
 import json
 import logging
 import os
+import signal
 import socket
 import sys
 from logging import Logger
-
-import aiomqtt
+from typing import TYPE_CHECKING
 
 from nuki_sesami.config import SesamiConfig, get_config
 from nuki_sesami.lock import NukiDoorsensorState, NukiLockState
 from nuki_sesami.state import DoorMode, DoorRequestState, DoorState
-from nuki_sesami.util import get_config_path, get_prefix, getlogger
+from nuki_sesami.util import (
+    enum_payloads,
+    get_config_path,
+    get_loop_factory,
+    get_prefix,
+    get_version,
+    getlogger,
+    mqtt_publisher,
+    payload_bytes,
+)
+
+if TYPE_CHECKING:
+    import aiomqtt
+
+NUKI_LOCK_STATES = enum_payloads(NukiLockState)
+NUKI_DOORSENSOR_STATES = enum_payloads(NukiDoorsensorState)
+DOOR_STATES = enum_payloads(DoorState)
+DOOR_MODES = enum_payloads(DoorMode)
+DOOR_REQUEST_STATES = {state.value: state for state in DoorRequestState}
+DOOR_REQUEST_STATE_PAYLOADS = payload_bytes(DoorRequestState)
+
+# json.dumps() creates a new encoder on every call when given non-default arguments
+JSONRPC_ENCODER = json.JSONEncoder(separators=(",", ":"), check_circular=False)
+
+
+def mqtt_publish_sesami_request_state(sesamibluez, state: DoorRequestState) -> None:
+    topic = sesamibluez.topics["sesami/request/state"]
+    sesamibluez.logger.info("[mqtt] publish %s=%i", topic, state.value)
+    sesamibluez.publish(topic, DOOR_REQUEST_STATE_PAYLOADS[state])
+
+
+async def bluetooth_flush_sesami_status(sesamibluez, keepalive: float = 60.0) -> None:
+    """Publishes the status to all smartphones once per burst of status changes.
+
+    Status setters only flag the change; e.g. the burst of retained messages received
+    when (re)subscribing on the MQTT broker results in a single status notification.
+    A burst that ends in the previously published status is not published again.
+    When nothing has changed the status is still published every keepalive seconds.
+    """
+    changed = sesamibluez.status_changed
+    published = None
+    while True:
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=keepalive)
+        except TimeoutError:
+            published = None
+        changed.clear()
+        await asyncio.sleep(0)
+        if sesamibluez.status_notification != published:
+            published = sesamibluez.status_notification
+            sesamibluez.publish_status()
 
 
-async def mqtt_publish_sesami_request_state(client, sesamibluez, state: DoorRequestState) -> None:
-    device = sesamibluez.nuki_device
-    sesamibluez.logger.info("[mqtt] publish sesami/%s/request/state=%i", device, state.value)
-    await client.publish(f"sesami/{device}/request/state", state.value)
+class SesamiBluetoothProtocol(asyncio.BufferedProtocol):
+    """Handles the connection with a single smartphone.
 
+    Received data is read directly into a preallocated buffer; each complete,
+    newline terminated, JSON-RPC request is handed over to the bluetooth agent.
+    """
 
-async def bluetooth_publish_sesami_status(sesamibluez, interval: int = 3) -> None:
-    while True:
-        await asyncio.sleep(interval)
-        sesamibluez.publish_status()
+    __slots__ = ("_agent", "_buffer", "_length", "_maxsize", "_transport")
+
+    def __init__(self, agent: SesamiBluetoothAgent, bufsize: int = 4096, maxsize: int = 65536):
+        self._agent = agent
+        self._transport: asyncio.Transport | None = None
+        self._buffer = bytearray(bufsize)
+        self._length = 0  # number of bytes received but not yet processed
+        self._maxsize = maxsize  # maximum size of the receive buffer, limits the size of a single request
 
+    def connection_made(self, transport) -> None:
+        self._transport = transport
+        self._agent.client_connected(transport)
+
+    def connection_lost(self, exc) -> None:
+        if self._transport:
+            self._agent.client_disconnected(self._transport, exc)
+        self._transport = None
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Returns the free part of the receive buffer; doubles the buffer when full.
 
-class SesamiBluetoothAgent(asyncio.Protocol):
+        A new buffer is allocated when growing, since asyncio may still hold
+        a view on the current one. When the buffer has reached its maximum size
+        without receiving a complete request, the data is dropped and the client
+        is disconnected.
+        """
+        if self._length == len(self._buffer):
+            if self._length >= self._maxsize:
+                self._agent.logger.warning("[bluez] request exceeds %i bytes; disconnecting client", self._maxsize)
+                self._length = 0
+                if self._transport:
+                    self._transport.close()
+            else:
+                self._buffer = self._buffer + bytes(min(len(self._buffer), self._maxsize - self._length))
+        return memoryview(self._buffer)[self._length :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Processes all complete requests and moves the remaining partial request to the
+        start of the buffer, without resizing the buffer.
+        """
+        self._length += nbytes
+        buffer = self._buffer
+        start = 0
+        while (end := buffer.find(b"\n", start, self._length)) >= 0:
+            self._agent.process_request(bytes(buffer[start:end]))
+            start = end + 1
+        if start:
+            self._length -= start
+            buffer[: self._length] = buffer[start : start + self._length]
+
+
+class SesamiBluetoothAgent:
     """Acts as broker between smartphones via bluetooth and the nuki-sesami
     eletrical door opener via mqtt.
 
@@ -38,10 +134,41 @@ class SesamiBluetoothAgent(asyncio.Protocol):
     Received door commands from smartphones are forwarded to the MQTT broker.
     """
 
+    __slots__ = (
+        "_clients",
+        "_door_mode",
+        "_door_state",
+        "_logger",
+        "_nuki_device",
+        "_nuki_doorsensor",
+        "_nuki_lock",
+        "_publish_queue",
+        "_relay_openclose",
+        "_relay_opendoor",
+        "_relay_openhold",
+        "_status_changed",
+        "_status_notification",
+        "_topics",
+        "_version",
+    )
+
     def __init__(self, logger: Logger, config: SesamiConfig, version: str):
         self._version = version
         self._logger = logger
         self._nuki_device = config.nuki_device
+        self._topics = {
+            name: name.replace("/", f"/{config.nuki_device}/", 1)
+            for name in [
+                "nuki/state",
+                "nuki/doorsensorState",
+                "sesami/state",
+                "sesami/mode",
+                "sesami/relay/openclose",
+                "sesami/relay/openhold",
+                "sesami/relay/opendoor",
+                "sesami/request/state",
+            ]
+        }
         self._nuki_lock = NukiLockState.undefined
         self._nuki_doorsensor = NukiDoorsensorState.unknown
         self._door_state = DoorState.closed
@@ -49,54 +176,56 @@ class SesamiBluetoothAgent(asyncio.Protocol):
         self._relay_openclose = False
         self._relay_openhold = False
         self._relay_opendoor = False
-        self._clients = []  # list of connected bluetooth clients
-        self._background_tasks = set()
-
-    def connection_made(self, transport) -> None:
+        self._clients: set[asyncio.Transport] = set()  # set of connected bluetooth clients(transports)
+        self._status_changed = asyncio.Event()
+        self._status_notification: bytes | None = None  # encoded status notification; None when outdated
+        # messages to be published; (topic, payload, qos, retain)
+        self._publish_queue: asyncio.Queue[tuple[str, bytes, int, bool]] = asyncio.Queue(maxsize=64)
+
+    def client_connected(self, transport: asyncio.Transport) -> None:
+        """Adds the client(transport) to the set of clients and sends it the current status"""
         peername = transport.get_extra_info("peername")
         self.logger.info("[bluez] client connected %s", peername)
-        self._clients.append(transport)
+        self._clients.add(transport)
         self.publish_status(transport)
 
-    def connection_lost(self, exc) -> None:
-        """Remove the client(transport) from the list of clients"""
+    def client_disconnected(self, transport: asyncio.Transport, exc: Exception | None) -> None:
+        """Remove the client(transport) from the set of clients"""
         self.logger.info("[bluez] client disconnected %r", exc)
-        self._clients = [c for c in self._clients if not c.is_closing()]
+        self._clients.discard(transport)
 
-    def run_coroutine(self, coroutine) -> None:
-        """Wraps the coroutine into a task and schedules its execution.
+    def publish(self, topic: str, payload, qos: int = 0, retain: bool = False) -> None:
+        """Queues a message for publishing on the MQTT broker; never blocks.
 
-        The task will be added to the set of background tasks.
-        This creates a strong reference.
+        The message is dropped when the queue is full; e.g. when smartphones send door
+        requests faster than they can be published on the broker.
+        """
+        try:
+            self._publish_queue.put_nowait((topic, payload, qos, retain))
+        except asyncio.QueueFull:
+            self.logger.warning("[mqtt] publish queue full; dropped %s=%s", topic, payload)
 
-        To prevent keeping references to finished tasks forever,
-        the task removes its own reference from the set of background tasks
-        after completion.
+    def process_request(self, request: bytes) -> None:
+        """Processes a single JSON-RPC request, as received without its newline terminator.
 
-        When called from a thread running outside of the event loop context
-        it is scheduled using asyncio.run_coroutine_threadsafe
+        Only 'set' requests are acted upon; requests that do not contain the "set" string,
+        e.g. the periodic 'alive' requests or blank lines, are dropped without parsing them.
+        Malformed requests; i.e. invalid JSON, missing members or an unknown door request
+        state, are logged and dropped without raising.
         """
-        task = asyncio.create_task(coroutine)
-        self._background_tasks.add(task)
-        task.add_done_callback(self._background_tasks.discard)
-
-    def process_request(self, request: str) -> None:
-        if not request:
+        if b'"set"' not in request:
             return
 
         try:
             req = json.loads(request)
-            if req["method"] == "set" and "door_request_state" in req["params"]:
-                state = DoorRequestState(req["params"]["door_request_state"])
-                self.run_coroutine(mqtt_publish_sesami_request_state(self._mqtt, self, state))
-        except json.decoder.JSONDecodeError:
-            self.logger.exception("[bluez] failed to process request(%s)", request)
-
-    def data_received(self, data) -> None:
-        msg = data.decode()
-        self.logger.debug("[bluez] data received: %r", msg)
-        for m in [s for s in msg.split("\n") if s]:
-            self.process_request(m)
+            if req["method"] != "set" or "door_request_state" not in req["params"]:
+                return
+            state = DOOR_REQUEST_STATES[req["params"]["door_request_state"]]
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.warning("[bluez] failed to process request(%r); %s: %s", request, type(e).__name__, e)
+            return
+
+        mqtt_publish_sesami_request_state(self, state)
 
     def get_status(self) -> dict:
         return {
@@ -110,25 +239,48 @@ class SesamiBluetoothAgent(asyncio.Protocol):
             "version": self._version,
         }
 
-    def get_jsonrpc_status_notification(self) -> str:
+    def get_jsonrpc_status_notification(self) -> bytes:
+        """Returns the status as UTF-8 encoded JSON-RPC notification"""
         status = self.get_status()
-        return json.dumps({"jsonrpc": "2.0", "method": "status", "params": status})
+        return JSONRPC_ENCODER.encode({"jsonrpc": "2.0", "method": "status", "params": status}).encode()
 
-    def publish_status(self, transport: asyncio.BaseTransport | None = None) -> None:
-        """Publish status to a specific or all smartphones."""
-        msg = self.get_jsonrpc_status_notification()
+    @property
+    def status_notification(self) -> bytes:
+        """The encoded status notification; only (re)encoded after the status has changed"""
+        if self._status_notification is None:
+            self._status_notification = self.get_jsonrpc_status_notification()
+        return self._status_notification
+
+    def _set_status_changed(self) -> None:
+        self._status_notification = None
+        self._status_changed.set()
+
+    def publish_status(self, transport: asyncio.WriteTransport | None = None) -> None:
+        """Publish status to a specific or all smartphones.
+
+        The newline terminator is passed along with the notification using writelines,
+        which lets the transport send both in a single call without joining them first.
+        Clients that are already closing are skipped and removed from the set of clients.
+        """
+        msg = self.status_notification
+        frame = (msg, b"\n")
+        debug = self.logger.isEnabledFor(logging.DEBUG)
 
         if transport:
-            self.logger.debug("[bluez] publish_status(N)=%s", msg)
-            transport.write(str(msg + "\n").encode())
+            if debug:
+                self.logger.debug("[bluez] publish_status(N)=%r", msg)
+            transport.writelines(frame)
         elif self._clients:
-            self.logger.debug("[bluez] publish_status(U%i)=%s", len(self._clients), msg)
+            if debug:
+                self.logger.debug("[bluez] publish_status(U%i)=%r", len(self._clients), msg)
+            closing = [client for client in self._clients if client.is_closing()]
+            self._clients.difference_update(closing)
             for client in self._clients:
-                client.write(str(msg + "\n").encode())
+                client.writelines(frame)
 
-    def activate(self, client: aiomqtt.Client) -> None:
-        self._mqtt = client
-        self.run_coroutine(bluetooth_publish_sesami_status(self))
+    def activate(self, client: aiomqtt.Client, task_group: asyncio.TaskGroup) -> None:
+        task_group.create_task(mqtt_publisher(client, self._publish_queue, self.logger))
+        task_group.create_task(bluetooth_flush_sesami_status(self))
 
     @property
     def logger(self) -> Logger:
@@ -138,14 +290,26 @@ class SesamiBluetoothAgent(asyncio.Protocol):
     def nuki_device(self) -> str:
         return self._nuki_device
 
+    @property
+    def topics(self) -> dict[str, str]:
+        """MQTT topics by name; e.g. 'nuki/state' -> 'nuki/<device>/state'"""
+        return self._topics
+
+    @property
+    def status_changed(self) -> asyncio.Event:
+        """Set when the status has changed and has not yet been published to the smartphones"""
+        return self._status_changed
+
     @property
     def nuki_lock(self) -> NukiLockState:
         return self._nuki_lock
 
     @nuki_lock.setter
     def nuki_lock(self, state: NukiLockState):
+        if self._nuki_lock == state:
+            return
         self._nuki_lock = state
-        self.publish_status()
+        self._set_status_changed()
 
     @property
     def nuki_doorsensor(self) -> NukiDoorsensorState:
@@ -153,8 +317,10 @@ class SesamiBluetoothAgent(asyncio.Protocol):
 
     @nuki_doorsensor.setter
     def nuki_doorsensor(self, state: NukiDoorsensorState):
+        if self._nuki_doorsensor == state:
+            return
         self._nuki_doorsensor = state
-        self.publish_status()
+        self._set_status_changed()
 
     @property
     def door_state(self) -> DoorState:
@@ -162,8 +328,10 @@ class SesamiBluetoothAgent(asyncio.Protocol):
 
     @door_state.setter
     def door_state(self, state: DoorState):
+        if self._door_state == state:
+            return
         self._door_state = state
-        self.publish_status()
+        self._set_status_changed()
 
     @property
     def door_mode(self) -> DoorMode:
@@ -171,8 +339,10 @@ class SesamiBluetoothAgent(asyncio.Protocol):
 
     @door_mode.setter
     def door_mode(self, mode: DoorMode):
+        if self._door_mode == mode:
+            return
         self._door_mode = mode
-        self.publish_status()
+        self._set_status_changed()
 
     @property
     def relay_openclose(self) -> bool:
@@ -180,8 +350,10 @@ class SesamiBluetoothAgent(asyncio.Protocol):
 
     @relay_openclose.setter
     def relay_openclose(self, state: bool):
+        if self._relay_openclose == state:
+            return
         self._relay_openclose = state
-        self.publish_status()
+        self._set_status_changed()
 
     @property
     def relay_openhold(self) -> bool:
@@ -189,8 +361,10 @@ class SesamiBluetoothAgent(asyncio.Protocol):
 
     @relay_openhold.setter
     def relay_openhold(self, state: bool):
+        if self._relay_openhold == state:
+            return
         self._relay_openhold = state
-        self.publish_status()
+        self._set_status_changed()
 
     @property
     def relay_opendoor(self) -> bool:
@@ -198,52 +372,104 @@ class SesamiBluetoothAgent(asyncio.Protocol):
 
     @relay_opendoor.setter
     def relay_opendoor(self, state: bool):
+        if self._relay_opendoor == state:
+            return
         self._relay_opendoor = state
-        self.publish_status()
+        self._set_status_changed()
+
+
+def mqtt_on_nuki_lock_state(agent: SesamiBluetoothAgent, payload: bytes) -> None:
+    agent.nuki_lock = NUKI_LOCK_STATES.get(payload, NukiLockState.undefined)
+
+
+def mqtt_on_nuki_doorsensor_state(agent: SesamiBluetoothAgent, payload: bytes) -> None:
+    agent.nuki_doorsensor = NUKI_DOORSENSOR_STATES.get(payload, NukiDoorsensorState.unknown)
+
+
+def mqtt_on_sesami_state(agent: SesamiBluetoothAgent, payload: bytes) -> None:
+    state = DOOR_STATES.get(payload)
+    if state is None:
+        agent.logger.warning("[mqtt] unknown door state %r", payload)
+        return
+    agent.door_state = state
+
+
+def mqtt_on_sesami_mode(agent: SesamiBluetoothAgent, payload: bytes) -> None:
+    mode = DOOR_MODES.get(payload)
+    if mode is None:
+        agent.logger.warning("[mqtt] unknown door mode %r", payload)
+        return
+    agent.door_mode = mode
+
+
+def mqtt_on_sesami_relay_openclose(agent: SesamiBluetoothAgent, payload: bytes) -> None:
+    agent.relay_openclose = payload == b"1"
+
+
+def mqtt_on_sesami_relay_openhold(agent: SesamiBluetoothAgent, payload: bytes) -> None:
+    agent.relay_openhold = payload == b"1"
+
+
+def mqtt_on_sesami_relay_opendoor(agent: SesamiBluetoothAgent, payload: bytes) -> None:
+    agent.relay_opendoor = payload == b"1"
 
 
 async def mqtt_receiver(client: aiomqtt.Client, agent: SesamiBluetoothAgent) -> None:
+    """Dispatches received MQTT messages to the handler of their topic."""
+    handlers = {
+        agent.topics["nuki/state"]: mqtt_on_nuki_lock_state,
+        agent.topics["nuki/doorsensorState"]: mqtt_on_nuki_doorsensor_state,
+        agent.topics["sesami/state"]: mqtt_on_sesami_state,
+        agent.topics["sesami/mode"]: mqtt_on_sesami_mode,
+        agent.topics["sesami/relay/openclose"]: mqtt_on_sesami_relay_openclose,
+        agent.topics["sesami/relay/openhold"]: mqtt_on_sesami_relay_openhold,
+        agent.topics["sesami/relay/opendoor"]: mqtt_on_sesami_relay_opendoor,
+    }
     async for msg in client.messages:
-        payload = msg.payload.decode()
-        topic = str(msg.topic)
-        agent.logger.info("[mqtt] receive %s=%s", topic, payload)
-        if topic == f"nuki/{agent.nuki_device}/state":
-            agent.nuki_lock = NukiLockState(int(payload))
-        elif topic == f"nuki/{agent.nuki_device}/doorsensorState":
-            agent.nuki_doorsensor = NukiDoorsensorState(int(payload))
-        elif topic == f"sesami/{agent.nuki_device}/state":
-            agent.door_state = DoorState(int(payload))
-        elif topic == f"sesami/{agent.nuki_device}/mode":
-            agent.door_mode = DoorMode(int(payload))
-        elif topic == f"sesami/{agent.nuki_device}/relay/openclose":
-            agent.relay_openclose = bool(int(payload))
-        elif topic == f"sesami/{agent.nuki_device}/relay/openhold":
-            agent.relay_openhold = bool(int(payload))
-        elif topic == f"sesami/{agent.nuki_device}/relay/opendoor":
-            agent.relay_opendoor = bool(int(payload))
+        topic = msg.topic.value
+        if agent.logger.isEnabledFor(logging.INFO):
+            agent.logger.info("[mqtt] receive %s=%s", topic, msg.payload.decode())
+        handler = handlers.get(topic)
+        if handler:
+            handler(agent, msg.payload)
 
 
 async def activate(logger: Logger, config: SesamiConfig, version: str) -> None:
-    blueagent = SesamiBluetoothAgent(logger, config, version)
+    # deferred; --help and --version do not need the MQTT stack
+    import aiomqtt
+
+    task = asyncio.current_task()
+    assert task is not None
     loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, task.cancel)
+
+    blueagent = SesamiBluetoothAgent(logger, config, version)
     sock = socket.socket(socket.AF_BLUETOOTH, socket.SOCK_STREAM, socket.BTPROTO_RFCOMM)
     sock.bind((config.bluetooth_macaddr, config.bluetooth_channel))
-    blueserver = await loop.create_server(lambda: blueagent, sock=sock, backlog=config.bluetooth_backlog)
+    sock.setblocking(False)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+    protocol_factory = functools.partial(SesamiBluetoothProtocol, blueagent)
+    blueserver = await loop.create_server(protocol_factory, sock=sock, backlog=config.bluetooth_backlog)
 
     async with aiomqtt.Client(
         config.mqtt_host, port=config.mqtt_port, username=config.mqtt_username, password=config.mqtt_password
     ) as client:
-        blueagent.activate(client)
-        device = blueagent.nuki_device
-        await client.subscribe(f"nuki/{device}/state")
-        await client.subscribe(f"nuki/{device}/doorsensorState")
-        await client.subscribe(f"sesami/{device}/state")
-        await client.subscribe(f"sesami/{device}/mode")
-        await client.subscribe(f"sesami/{device}/relay/openclose")
-        await client.subscribe(f"sesami/{device}/relay/openhold")
-        await client.subscribe(f"sesami/{device}/relay/opendoor")
+        topics = blueagent.topics
+        await client.subscribe(
+            [
+                (topics["nuki/state"], 0),
+                (topics["nuki/doorsensorState"], 0),
+                (topics["sesami/state"], 0),
+                (topics["sesami/mode"], 0),
+                (topics["sesami/relay/openclose"], 0),
+                (topics["sesami/relay/openhold"], 0),
+                (topics["sesami/relay/opendoor"], 0),
+            ]
+        )
 
         async with asyncio.TaskGroup() as tg:
+            blueagent.activate(client, tg)
             tg.create_task(mqtt_receiver(client, blueagent))
             tg.create_task(blueserver.serve_forever())
 
@@ -267,7 +493,7 @@ def main():
     parser.add_argument("-v", "--version", help="print version and exit", action="store_true")
 
     args = parser.parse_args()
-    version = importlib.metadata.version("nuki-sesami")
+    version = get_version()
     if args.version:
         print(version)  # noqa: T201
         sys.exit(0)
@@ -282,22 +508,32 @@ def main():
     logger = getlogger("nuki-sesami-bluez", logpath, level=logging.DEBUG if args.verbose else logging.INFO)
     config = get_config(cpath)
 
-    logger.info("version          : %s", version)
-    logger.info("prefix           : %s", prefix)
-    logger.info("config-path      : %s", cpath)
-    logger.info("nuki.device      : %s", config.nuki_device)
-    logger.info("mqtt.host        : %s", config.mqtt_host)
-    logger.info("mqtt.port        : %i", config.mqtt_port)
-    logger.info("mqtt.username    : %s", config.mqtt_username)
-    logger.info("mqtt.password    : %s", "***")
-    logger.info("bluetooth.macaddr: %s", config.bluetooth_macaddr)
-    logger.info("bluetooth.channel: %i", config.bluetooth_channel)
-    logger.info("bluetooth.backlog: %i", config.bluetooth_backlog)
+    loop_factory = get_loop_factory()
+    logger.info(
+        "startup config: %s",
+        {
+            "version": version,
+            "prefix": prefix,
+            "config-path": cpath,
+            "nuki.device": config.nuki_device,
+            "mqtt.host": config.mqtt_host,
+            "mqtt.port": config.mqtt_port,
+            "mqtt.username": config.mqtt_username,
+            "mqtt.password": "***",
+            "bluetooth.macaddr": config.bluetooth_macaddr,
+            "bluetooth.channel": config.bluetooth_channel,
+            "bluetooth.backlog": config.bluetooth_backlog,
+            "event-loop": "uvloop" if loop_factory else "asyncio",
+        },
+    )
 
     try:
-        asyncio.run(activate(logger, config, version))
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(activate(logger, config, version))
     except KeyboardInterrupt:
         logger.info("program terminated; keyboard interrupt")
+    except asyncio.CancelledError:
+        logger.info("program terminated; stopped (SIGTERM)")
     except Exception:
         logger.exception("something went wrong, exception")
 
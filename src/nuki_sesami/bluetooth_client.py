@@ -1,18 +1,29 @@
 import argparse
 import asyncio
-import importlib.metadata
 import json
 import logging
 import socket
 import sys
 
 from nuki_sesami.state import DoorRequestState
+from nuki_sesami.util import get_version
+
+
+def jsonrpc_frame(method: str, params: dict | None = None) -> bytes:
+    """Returns the compact JSON encoded, newline terminated, JSON-RPC message"""
+    msg: dict[str, object] = {"jsonrpc": "2.0", "method": method}
+    if params:
+        msg["params"] = params
+    return json.dumps(msg, separators=(",", ":")).encode() + b"\n"
+
+
+ALIVE_FRAME = jsonrpc_frame("alive")
+DOOR_REQUEST_FRAMES = {state: jsonrpc_frame("set", {"door_request_state": state.value}) for state in DoorRequestState}
 
 
 async def send_alive(writer: asyncio.StreamWriter, addr: str, channel: int, logger: logging.Logger) -> None:
     logger.info("send[%s, ch=%i] alive", addr, channel)
-    msg = json.dumps({"jsonrpc": "2.0", "method": "alive"})
-    writer.write(str(msg + "\n").encode())
+    writer.write(ALIVE_FRAME)
     await writer.drain()
 
 
@@ -20,8 +31,7 @@ async def send_door_request(
     writer: asyncio.StreamWriter, state: DoorRequestState, addr: str, channel: int, logger: logging.Logger
 ) -> None:
     logger.info("send[%s, ch=%i] door_request(%s:%i)", addr, channel, state.name, state.value)
-    msg = json.dumps({"jsonrpc": "2.0", "method": "set", "params": {"door_request_state": state.value}})
-    writer.write(str(msg + "\n").encode())
+    writer.write(DOOR_REQUEST_FRAMES[state])
     await writer.drain()
 
 
@@ -46,10 +56,12 @@ async def receive_status(
     n = maxrecv
     c = 0
     while (n < 0) or (c < n):
-        data = await reader.read(1024)
-        if not data:
+        try:
+            data = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError:
             break
-        logger.info("recv[%s, ch=%i] status(%s)", addr, channel, data.decode())
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("recv[%s, ch=%i] status(%s)", addr, channel, data[:-1].decode())
         c += 1
 
 
@@ -117,7 +129,7 @@ def main():
 
     args = parser.parse_args()
 
-    version = importlib.metadata.version("nuki-sesami")
+    version = get_version()
     if args.version:
         print(version)  # noqa: T201
         sys.exit(0)
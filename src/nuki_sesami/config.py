@@ -18,7 +18,7 @@ class SesamiConfig:
         bluetooth = config["bluetooth"]
         self._bluetooth_macaddr = bluetooth["macaddr"]
         self._bluetooth_channel = bluetooth["channel"]
-        self._bluetooth_backlog = bluetooth["backlog"] if "backlog" in bluetooth else 10
+        self._bluetooth_backlog = bluetooth.get("backlog", 10)
 
         gpio = config["gpio"]
         self._gpio_pushbutton = gpio["pushbutton"]
@@ -26,9 +26,9 @@ class SesamiConfig:
         self._gpio_openhold_mode = gpio["openhold-mode"]
         self._gpio_openclose_mode = gpio["openclose-mode"]
         self._pushbutton = PushbuttonLogic[config["pushbutton"]]
-        self._door_open_time = config["door-open-time"] if "door-open-time" in config else 40
-        self._door_close_time = config["door-close-time"] if "door-close-time" in config else 10
-        self._lock_unlatch_time = config["lock-unlatch-time"] if "lock-unlatch-time" in config else 4
+        self._door_open_time = config.get("door-open-time", 40)
+        self._door_close_time = config.get("door-close-time", 10)
+        self._lock_unlatch_time = config.get("lock-unlatch-time", 4)
 
     @property
     def nuki_device(self) -> str:
@@ -105,11 +105,11 @@ def get_config(prefix: str) -> SesamiConfig:
     * config: SesamiConfig instance
     """
     fname = os.path.join(prefix, "config.json")
-    with open(fname) as f:
-        config = json.load(f)
+    with open(fname, "rb") as f:
+        config = json.loads(f.read())
 
     fname = os.path.join(prefix, "auth.json")
-    with open(fname) as f:
-        auth = json.load(f)
+    with open(fname, "rb") as f:
+        auth = json.loads(f.read())
 
     return SesamiConfig(config, auth)
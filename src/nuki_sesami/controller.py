@@ -9,63 +9,96 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import datetime
-import importlib.metadata
 import logging
+import math
 import os
+import signal
 import sys
+import time
+from collections.abc import Callable, Mapping
 from logging import Logger
+from typing import TYPE_CHECKING
 
-import aiomqtt
-from gpiozero import Button, DigitalOutputDevice
+from gpiozero import Button, Device, DigitalOutputDevice
 
 from nuki_sesami.config import SesamiConfig, get_config
 from nuki_sesami.lock import NukiDoorsensorState, NukiLockAction, NukiLockActionEvent, NukiLockState, NukiLockTrigger
 from nuki_sesami.state import DoorMode, DoorOpenTrigger, DoorRequestState, DoorState, PushbuttonLogic
-from nuki_sesami.util import get_config_path, get_prefix, getlogger
-
-
-async def mqtt_publish_nuki_lock_action(
-    client: aiomqtt.Client, device: str, logger: Logger, action: NukiLockAction
-) -> None:
-    topic = f"nuki/{device}/lockAction"
-    logger.info("[mqtt] publish %s=%s:%i", topic, action.name, action.value)
-    await client.publish(topic, action.value, retain=False)
-
-
-async def mqtt_publish_sesami_version(client: aiomqtt.Client, device: str, logger: Logger, version: str) -> None:
-    topic = f"sesami/{device}/version"
-    logger.info("[mqtt] publish %s=%s (retain)", topic, version)
-    await client.publish(topic, version, retain=True)
-
-
-async def mqtt_publish_sesami_state(client: aiomqtt.Client, device: str, logger: Logger, state: DoorState) -> None:
-    topic = f"sesami/{device}/state"
-    logger.info("[mqtt] publish %s=%s:%i (retain)", topic, state.name, state.value)
-    await client.publish(topic, state.value, retain=True)
-
-
-async def mqtt_publish_sesami_mode(client: aiomqtt.Client, device: str, logger: Logger, state: DoorMode) -> None:
-    topic = f"sesami/{device}/mode"
-    logger.info("[mqtt] publish %s=%s:%i (retain)", topic, state.name, state.value)
-    await client.publish(topic, state.value, retain=True)
-
+from nuki_sesami.util import (
+    enum_payloads,
+    get_config_path,
+    get_loop_factory,
+    get_prefix,
+    get_version,
+    getlogger,
+    mqtt_publisher,
+    payload_bytes,
+)
+
+if TYPE_CHECKING:
+    import aiomqtt
+
+NUKI_LOCK_STATES = enum_payloads(NukiLockState)
+NUKI_DOORSENSOR_STATES = enum_payloads(NukiDoorsensorState)
+DOOR_REQUEST_STATES = enum_payloads(DoorRequestState)
+NUKI_LOCK_ACTION_PAYLOADS = payload_bytes(NukiLockAction)
+DOOR_STATE_PAYLOADS = payload_bytes(DoorState)
+DOOR_MODE_PAYLOADS = payload_bytes(DoorMode)
+RELAY_PAYLOADS = (b"0", b"1")
+NUKI_LOCK_STATES_LOCKED = frozenset({NukiLockState.locked, NukiLockState.locking})
+STATE_PUBLISH_DELAY = 0.05  # [s] door state changes within this window are published once
+# next door state when pressing the pushbutton, indexed by the current door state
+PUSHBUTTON_OPENHOLD_STATES = (DoorState.openhold, DoorState.closed, DoorState.closed)
+PUSHBUTTON_TOGGLE_STATES = (DoorState.opened, DoorState.openhold, DoorState.closed)
+
+
+def mqtt_publish_nuki_lock_action(door: ElectricDoor, action: NukiLockAction) -> None:
+    topic = door.topics["nuki/lockAction"]
+    door.logger.info("[mqtt] publish %s=%s:%i", topic, action.name, action.value)
+    door.publish(topic, NUKI_LOCK_ACTION_PAYLOADS[action], qos=1)
+
+
+def mqtt_publish_sesami_version(door: ElectricDoor, version: str) -> None:
+    topic = door.topics["sesami/version"]
+    door.logger.info("[mqtt] publish %s=%s (retain)", topic, version)
+    door.publish(topic, version, retain=True)
+
+
+def mqtt_publish_sesami_state(door: ElectricDoor, state: DoorState) -> None:
+    topic = door.topics["sesami/state"]
+    door.logger.info("[mqtt] publish %s=%s:%i (retain)", topic, state.name, state.value)
+    door.publish(topic, DOOR_STATE_PAYLOADS[state], retain=True)
+
+
+def mqtt_publish_sesami_mode(door: ElectricDoor, state: DoorMode) -> None:
+    topic = door.topics["sesami/mode"]
+    door.logger.info("[mqtt] publish %s=%s:%i (retain)", topic, state.name, state.value)
+    door.publish(topic, DOOR_MODE_PAYLOADS[state], retain=True)
+
+
+def mqtt_publish_sesami_relay_state(door: ElectricDoor, name: str, state: int, retain=True) -> None:
+    """Publishes the relay state, unless it equals the last published state of that relay."""
+    if door.relay_states[name] == state:
+        return
+    door.relay_states[name] = state
+    topic = door.relay_topics[name]
+    door.logger.info("[mqtt] publish %s=%i%s", topic, state, " (retain)" if retain else "")
+    door.publish(topic, RELAY_PAYLOADS[state], retain=retain)
 
-async def mqtt_publish_sesami_relay_state(
-    client: aiomqtt.Client, device: str, name: str, logger: Logger, state: int, retain=True
-) -> None:
-    topic = f"sesami/{device}/relay/{name}"
-    logger.info("[mqtt] publish %s=%i%s", topic, state, " (retain)" if retain else "")
-    await client.publish(topic, state, retain=retain)
 
+def mqtt_publish_sesami_relay_mode(door: ElectricDoor, mode: DoorMode) -> None:
+    """Publishes the openhold and openclose relay states of the door mode.
 
-async def mqtt_publish_sesami_relay_opendoor_blink(client: aiomqtt.Client, device: str, logger: Logger) -> None:
-    await mqtt_publish_sesami_relay_state(client, device, "opendoor", logger, 1)
-    await asyncio.sleep(1)
-    await mqtt_publish_sesami_relay_state(client, device, "opendoor", logger, 0)
+    The messages are queued back-to-back and therefore sent by the publisher as a single batch;
+    relays whose state did not change are not published again. The mode itself is published
+    together with the (delayed) door state it is derived from.
+    """
+    openhold = int(mode == DoorMode.openhold)
+    mqtt_publish_sesami_relay_state(door, "openhold", openhold)
+    mqtt_publish_sesami_relay_state(door, "openclose", 1 - openhold)
 
 
-async def timed_door_closed(door, open_time: float, close_time: float, check_interval: float = 3.0) -> None:
+async def timed_door_closed(door, open_time: float, close_time: float) -> None:
     """Verifies and corrects the (logical) door state to closed when needed.
 
     Sometimes when opening the door, the door state is not updated to closed once the
@@ -77,22 +110,28 @@ async def timed_door_closed(door, open_time: float, close_time: float, check_int
       again within 40 seconds.
     - When ending the 'openhold' mode we expect the door to be closed within 10 seconds.
 
+    Instead of polling, waits for the door state (or openhold relay) to change until the
+    deadline for the current door state has been reached.
+
     Arguments:
     - door: The electric door instance
     - open_time: The time (in [s]) needed to open and close the door
     - close_time: The time (in [s]) needed to close the door when ending openhold mode
-    - check_interval: The check interval (in [s]) for the door state
     """
+    event = door.state_event
     while True:
-        await asyncio.sleep(check_interval)
-        dt = datetime.datetime.now(tz=datetime.UTC) - door.state_changed_time
+        timeout = None
         if door.state == DoorState.opened:
-            dt_open = datetime.timedelta(seconds=open_time)
-            if dt > dt_open:
-                door.state = DoorState.closed
-        elif door.state == DoorState.openhold:
-            dt_unlatched = datetime.timedelta(seconds=close_time)
-            if dt > dt_unlatched and not door.gpio_openhold_set:
+            timeout = open_time
+        elif door.state == DoorState.openhold and not door.gpio_openhold_set:
+            timeout = close_time
+        if timeout is not None:
+            timeout = max(0.0, timeout - (time.monotonic() - door.state_changed_time))
+        event.clear()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except TimeoutError:
+            if door.state == DoorState.opened or (door.state == DoorState.openhold and not door.gpio_openhold_set):
                 door.state = DoorState.closed
 
 
@@ -107,7 +146,7 @@ async def timed_lock_unlatched(door, unlatch_time: float = 4.0) -> None:
     - check_interval: The interval (in [s]) to check if the lock is unlatched
     """
     await asyncio.sleep(unlatch_time)
-    if door.lock != NukiLockState.unlatching:
+    if door.lock is not NukiLockState.unlatching:
         return
     door.on_lock_unlatched(DoorOpenTrigger.unlatch_timeout)
 
@@ -124,9 +163,14 @@ class PushButton(Button):
 
 
 def pushbutton_pressed(button: PushButton) -> None:
+    """Called by gpiozero from its own thread; hands the press over to the event loop.
+
+    This way on_pushbutton_pressed, and with it all door state changes, only runs on
+    the event loop thread.
+    """
     door = button.userdata
     door.logger.info("(input) door (open/hold/close) push button %s is pressed", button.pin)
-    door.on_pushbutton_pressed()
+    door.loop.call_soon_threadsafe(door.on_pushbutton_pressed)
 
 
 class ElectricDoor:
@@ -136,9 +180,45 @@ class ElectricDoor:
     it will activate a relay, e.g. using the 'RPi Relay Board', triggering the electric door to open.
     """
 
+    __slots__ = (
+        "_door_close_time",
+        "_door_open_time",
+        "_door_opened",
+        "_lock_unlatch_requested",
+        "_lock_unlatch_time",
+        "_logger",
+        "_loop",
+        "_nuki_action",
+        "_nuki_action_event",
+        "_nuki_device",
+        "_nuki_doorsensor",
+        "_nuki_state",
+        "_openclose_mode",
+        "_opendoor",
+        "_opendoor_off",
+        "_openhold_mode",
+        "_publish_queue",
+        "_pushbutton",
+        "_relay_states",
+        "_relay_topics",
+        "_state",
+        "_state_changed",
+        "_state_event",
+        "_state_publish",
+        "_task_group",
+        "_topics",
+        "_version",
+    )
+
+    _classname = "ElectricDoor"
+    """The class name, as used in log messages; set once per subclass"""
+
     _nuki_device: str
     """The hexadecimal Nuki device ID"""
 
+    _topics: dict[str, str]
+    """MQTT topics by name; the name is the topic without the device ID, e.g. 'nuki/state'"""
+
     _nuki_state: NukiLockState
     """The current Nuki lock state"""
 
@@ -157,17 +237,40 @@ class ElectricDoor:
     _opendoor: Relay
     """GPIO Relay for opening the door (momentarily); uses normally open relay (NO)"""
 
+    _opendoor_off: None | asyncio.TimerHandle
+    """Pending event loop timer switching the opendoor relay off again; None when no pulse is active"""
+
     _openhold_mode: Relay
     """GPIO Relay for holding the door open; uses normally open relay (NO)"""
 
     _openclose_mode: Relay
     """GPIO Relay for closing the door; uses normally open relay (NO)"""
 
+    _relay_states: dict[str, None | int]
+    """Last published state by relay name; None when not yet published"""
+
+    _relay_topics: dict[str, str]
+    """MQTT topic by relay name; e.g. 'opendoor' -> 'sesami/<device>/relay/opendoor'"""
+
+    _publish_queue: asyncio.Queue
+    """Messages waiting to be published on the MQTT broker; (topic, payload, qos, retain)"""
+
+    _task_group: asyncio.TaskGroup
+    """Task group running the background tasks; e.g. publisher and timers. Set on activation"""
+
     _state: DoorState
     """The current door state"""
 
-    _state_changed: datetime.datetime
-    """Timestamp when the door state was last changed"""
+    _state_changed: float
+    """Monotonic timestamp, in seconds, when the door state was last changed"""
+
+    _state_publish: None | asyncio.TimerHandle
+    """Pending event loop timer publishing the (final) door state and mode; None when nothing is pending.
+    Coalesces bursts of door state changes into a single publish.
+    """
+
+    _state_event: asyncio.Event
+    """Set when the door state or openhold relay changes; wakes up the timed door closed check"""
 
     _door_opened: bool
     """Flag indicating the door has (already) been opened. Prevents the open(hold) actions
@@ -185,10 +288,35 @@ class ElectricDoor:
     _lock_unlatch_time: int
     """The estimated time, in seconds, for the lock to move from locked or latched to unlatched"""
 
+    _lock_unlatch_requested: float
+    """Monotonic timestamp, in seconds, of the last unlatch request still awaiting the lock to unlatch.
+    Repeated unlatch requests within the lock unlatch time are coalesced into the pending request.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._classname = cls.__name__
+
     def __init__(self, logger: Logger, config: SesamiConfig, version: str):
         self._logger = logger
         self._version = version
         self._nuki_device = config.nuki_device
+        self._topics = {
+            name: name.replace("/", f"/{config.nuki_device}/", 1)
+            for name in [
+                "nuki/state",
+                "nuki/lockAction",
+                "nuki/lockActionEvent",
+                "nuki/doorsensorState",
+                "sesami/request/state",
+                "sesami/version",
+                "sesami/state",
+                "sesami/mode",
+                "sesami/relay/opendoor",
+                "sesami/relay/openhold",
+                "sesami/relay/openclose",
+            ]
+        }
         self._nuki_state = NukiLockState.undefined
         self._nuki_doorsensor = NukiDoorsensorState.unknown
         self._nuki_action = None
@@ -196,65 +324,104 @@ class ElectricDoor:
         self._pushbutton = PushButton(config.gpio_pushbutton, self, bounce_time=1.0)
         self._pushbutton.when_pressed = pushbutton_pressed
         self._opendoor = Relay(config.gpio_opendoor, False)
+        self._opendoor_off = None
         self._openhold_mode = Relay(config.gpio_openhold_mode, False)
         self._openclose_mode = Relay(config.gpio_openclose_mode, False)
+        self._relay_states = {"opendoor": None, "openhold": None, "openclose": None}
+        self._relay_topics = {name: self._topics[f"sesami/relay/{name}"] for name in self._relay_states}
         self._state = DoorState.closed
-        self._state_changed = datetime.datetime.now(tz=datetime.UTC)
+        self._state_changed = time.monotonic()
+        self._state_event = asyncio.Event()
+        self._state_publish = None
         self._door_opened = False
         self._door_open_time = config.door_open_time
         self._door_close_time = config.door_close_time
         self._lock_unlatch_time = config.lock_unlatch_time
-        self._background_tasks = set()
+        self._lock_unlatch_requested = -math.inf
+        self._publish_queue = asyncio.Queue()
 
     def run_coroutine(self, coroutine) -> None:
         """Wraps the coroutine into a task and schedules its execution
 
-        The task will be added to the set of background tasks.
-        This creates a strong reference.
+        The task is created in the task group of the electric door, which keeps
+        a strong reference to it until completion and cancels it on shutdown.
+        Must be called from within the event loop.
+        """
+        self._task_group.create_task(coroutine)
+
+    def publish(self, topic: str, payload, qos: int = 0, retain: bool = False) -> None:
+        """Queues a message for publishing on the MQTT broker; never blocks.
+
+        Must be called from within the event loop.
+        """
+        self._publish_queue.put_nowait((topic, payload, qos, retain))
 
-        To prevent keeping references to finished tasks forever,
-        the task removes its own reference from the set of background tasks
-        after completion.
+    def opendoor_pulse(self, duration: float = 1.0) -> None:
+        """Switches the opendoor relay on and, using an event loop timer, off again after duration seconds.
 
-        When called from a thread running outside of the event loop context
-        it is scheduled using asyncio.run_coroutine_threadsafe
+        The relay state is published when the pulse starts and when it ends; no task is kept
+        sleeping in between. A pulse requested while the previous one is still active restarts
+        its timer without publishing the relay state again.
+        Both edges are published without retain; the broker keeps the (retained) opendoor=0
+        published on activation.
+        Must be called from within the event loop.
         """
-        try:
-            _ = asyncio.get_running_loop()
-            task = asyncio.create_task(coroutine)
-            self._background_tasks.add(task)
-            task.add_done_callback(self._background_tasks.discard)
-        except RuntimeError:
-            asyncio.run_coroutine_threadsafe(coroutine, self.loop)
-
-    def activate(self, client: aiomqtt.Client, loop: asyncio.AbstractEventLoop) -> None:
+        if self._opendoor_off:
+            self._opendoor_off.cancel()
+        else:
+            mqtt_publish_sesami_relay_state(self, "opendoor", 1, retain=False)
+        self._opendoor.on()
+        self._opendoor_off = self.loop.call_later(duration, self._opendoor_pulse_end)
+
+    def _publish_state(self) -> None:
+        self._state_publish = None
+        mqtt_publish_sesami_state(self, self._state)
+        mqtt_publish_sesami_mode(self, self.mode)
+
+    def _opendoor_pulse_end(self) -> None:
+        self._opendoor_off = None
+        self._opendoor.off()
+        mqtt_publish_sesami_relay_state(self, "opendoor", 0, retain=False)
+
+    def notify_state_changed(self) -> None:
+        """Wakes up tasks waiting on the door state event.
+
+        Must be called from within the event loop.
+        """
+        self._state_event.set()
+
+    def activate(self, client: aiomqtt.Client, task_group: asyncio.TaskGroup) -> None:
         """Activates the electric door logic
 
+        Must be called from within the running event loop; MQTT, GPIO callbacks
+        and timers all share this single loop. Background tasks are created in
+        the given task group.
+
         Initializes GPIO to pins to default state, publishes initial (relay) states
         and modes on MQTT.
         Reset latched requests, if any, to 'unlatch' the lock; this may force the
         lock from its full lock; e.g. when (re)starting this service during night hours.
         """
-        self._mqtt = client
-        self._loop = loop
+        self._loop = asyncio.get_running_loop()
+        self._task_group = task_group
+        self.run_coroutine(mqtt_publisher(client, self._publish_queue, self.logger))
         self.logger.info("(relay) opendoor(0), openhold(0), openclose(1)")
         self._opendoor.off()
         self._openhold_mode.off()
         self._openclose_mode.on()
         self.run_coroutine(timed_door_closed(self, self._door_open_time, self._door_close_time))
 
-        for name, state in [("opendoor", 0), ("openhold", 0), ("openclose", 1)]:
-            self.run_coroutine(mqtt_publish_sesami_relay_state(self._mqtt, self.nuki_device, name, self.logger, state))
-
-        self.run_coroutine(mqtt_publish_sesami_version(self._mqtt, self.nuki_device, self.logger, self.version))
+        mqtt_publish_sesami_relay_state(self, "opendoor", 0)
+        mqtt_publish_sesami_relay_mode(self, self.mode)
 
-        self.run_coroutine(mqtt_publish_sesami_state(self._mqtt, self.nuki_device, self.logger, self.state))
+        mqtt_publish_sesami_version(self, self.version)
 
-        self.run_coroutine(mqtt_publish_sesami_mode(self._mqtt, self.nuki_device, self.logger, self.mode))
+        mqtt_publish_sesami_state(self, self.state)
+        mqtt_publish_sesami_mode(self, self.mode)
 
     @property
     def classname(self) -> str:
-        return type(self).__name__
+        return self._classname
 
     @property
     def logger(self) -> Logger:
@@ -274,6 +441,11 @@ class ElectricDoor:
         """The hexadecimal Nuki device ID"""
         return self._nuki_device
 
+    @property
+    def topics(self) -> dict[str, str]:
+        """MQTT topics by name; e.g. 'nuki/state' -> 'nuki/<device>/state'"""
+        return self._topics
+
     @property
     def lock(self) -> NukiLockState:
         """Get | set the Nuki lock state"""
@@ -305,13 +477,29 @@ class ElectricDoor:
             self._door_opened = False
         self.logger.info("(state) %s -> %s", self._state.name, state.name)
         self._state = state
-        self._state_changed = datetime.datetime.now(tz=datetime.UTC)
-        self.run_coroutine(mqtt_publish_sesami_state(self._mqtt, self.nuki_device, self.logger, state))
-        self.run_coroutine(mqtt_publish_sesami_mode(self._mqtt, self.nuki_device, self.logger, self.mode))
+        self._state_changed = time.monotonic()
+        self.notify_state_changed()
+        if self._state_publish is None:
+            self._state_publish = self.loop.call_later(STATE_PUBLISH_DELAY, self._publish_state)
+
+    @property
+    def relay_topics(self) -> dict[str, str]:
+        """MQTT topic by relay name; e.g. 'opendoor' -> 'sesami/<device>/relay/opendoor'"""
+        return self._relay_topics
+
+    @property
+    def relay_states(self) -> dict[str, None | int]:
+        """Last published state by relay name; None when not yet published."""
+        return self._relay_states
 
     @property
-    def state_changed_time(self) -> datetime.datetime:
-        """Timestamp when the door state was last changed."""
+    def state_event(self) -> asyncio.Event:
+        """Event set when the door state or openhold relay changes."""
+        return self._state_event
+
+    @property
+    def state_changed_time(self) -> float:
+        """Monotonic timestamp, in seconds, when the door state was last changed."""
         return self._state_changed
 
     @property
@@ -329,11 +517,16 @@ class ElectricDoor:
 
     def request_lock_action(self, action: NukiLockAction) -> None:
         self.logger.info("(lock) request action=%s", action.name)
-        self.run_coroutine(mqtt_publish_nuki_lock_action(self._mqtt, self.nuki_device, self.logger, action))
+        mqtt_publish_nuki_lock_action(self, action)
 
     def unlatch(self) -> None:
-        if self.lock in [NukiLockState.unlatching]:
+        if self.lock is NukiLockState.unlatching:
+            return
+        now = time.monotonic()
+        if now - self._lock_unlatch_requested < self._lock_unlatch_time:
+            self.logger.info("(unlatch) state=%s, lock=%s, already requested", self.state.name, self.lock.name)
             return
+        self._lock_unlatch_requested = now
         self.logger.info("(unlatch) state=%s, lock=%s", self.state.name, self.lock.name)
         self.request_lock_action(NukiLockAction.unlatch)
 
@@ -343,29 +536,26 @@ class ElectricDoor:
 
     def open(self, trigger: DoorOpenTrigger) -> None:  # noqa: A003
         self.logger.info("(open) state=%s, lock=%s, trigger=%s", self.state.name, self.lock.name, trigger.name)
-        self.logger.info("(relay) opendoor(blink 1[s])")
-        self._opendoor.blink(on_time=1, off_time=1, n=1, background=True)
-        self.run_coroutine(mqtt_publish_sesami_relay_opendoor_blink(self._mqtt, self.nuki_device, self.logger))
+        self.logger.info("(relay) opendoor(pulse 1[s])")
+        self.opendoor_pulse()
 
     def openhold(self, trigger: DoorOpenTrigger) -> None:
         self.logger.info("(openhold) state=%s, lock=%s, trigger=%s", self.state.name, self.lock.name, trigger.name)
         self.logger.info("(relay) openhold(1), openclose(0)")
         self._openhold_mode.on()
         self._openclose_mode.off()
-        for name, state in [("opendoor", 0), ("openhold", 1), ("openclose", 0)]:
-            self.run_coroutine(mqtt_publish_sesami_relay_state(self._mqtt, self.nuki_device, name, self.logger, state))
-        self.run_coroutine(mqtt_publish_sesami_mode(self._mqtt, self.nuki_device, self.logger, DoorMode.openhold))
+        self.notify_state_changed()
+        mqtt_publish_sesami_relay_mode(self, DoorMode.openhold)
 
     def close(self) -> None:
         self.logger.info("(close) state=%s, lock=%s", self.state.name, self.lock.name)
-        if self.lock in [NukiLockState.locked, NukiLockState.locking]:
+        if self.lock in NUKI_LOCK_STATES_LOCKED:
             self.unlock()
         self.logger.info("(relay) openhold(0), openclose(1)")
         self._openhold_mode.off()
         self._openclose_mode.on()
-        for name, state in [("opendoor", 0), ("openhold", 0), ("openclose", 1)]:
-            self.run_coroutine(mqtt_publish_sesami_relay_state(self._mqtt, self.nuki_device, name, self.logger, state))
-        self.run_coroutine(mqtt_publish_sesami_mode(self._mqtt, self.nuki_device, self.logger, DoorMode.openclose))
+        self.notify_state_changed()
+        mqtt_publish_sesami_relay_mode(self, DoorMode.openclose)
 
     def on_lock_state(self, lock: NukiLockState) -> None:
         self.logger.info("(lock_state) %s -> %s", self.lock.name, lock.name)
@@ -375,6 +565,7 @@ class ElectricDoor:
             self.run_coroutine(timed_lock_unlatched(self, self._lock_unlatch_time))
 
         elif lock == NukiLockState.unlatched:
+            self._lock_unlatch_requested = -math.inf
             self.on_lock_unlatched(DoorOpenTrigger.lock_unlatched)
 
     def on_lock_unlatched(self, trigger: DoorOpenTrigger) -> None:
@@ -459,11 +650,13 @@ class ElectricDoorPushbuttonOpenHold(ElectricDoor):
     When pressing the pushbutton the door will be opened and held open until the pushbutton is pressed again.
     """
 
+    __slots__ = ()
+
     def __init__(self, logger: logging.Logger, config: SesamiConfig, version: str):
         super().__init__(logger, config, version)
 
     def _next_door_state(self, state: DoorState) -> DoorState:
-        return DoorState.openhold if state == DoorState.closed else DoorState.closed
+        return PUSHBUTTON_OPENHOLD_STATES[state]
 
     def on_pushbutton_pressed(self) -> None:
         self.logger.info("(%s.pushbutton_pressed) state=%s, lock=%s", self.classname, self.state.name, self.lock.name)
@@ -480,6 +673,8 @@ class ElectricDoorPushbuttonOpen(ElectricDoor):
     When pressing the pushbutton the door will be opened for a few seconds after which it will be closed again.
     """
 
+    __slots__ = ()
+
     def __init__(self, logger: logging.Logger, config: SesamiConfig, version: str):
         super().__init__(logger, config, version)
 
@@ -497,11 +692,13 @@ class ElectricDoorPushbuttonToggle(ElectricDoor):
     is pressed again.
     """
 
+    __slots__ = ()
+
     def __init__(self, logger: logging.Logger, config: SesamiConfig, version: str):
         super().__init__(logger, config, version)
 
     def _next_door_state(self, state: DoorState) -> DoorState:
-        return DoorState((state + 1) % len(DoorState))
+        return PUSHBUTTON_TOGGLE_STATES[state]
 
     def on_pushbutton_pressed(self) -> None:
         self.logger.info("(%s.pushbutton_pressed) state=%s, lock=%s", self.classname, self.state.name, self.lock.name)
@@ -514,48 +711,104 @@ class ElectricDoorPushbuttonToggle(ElectricDoor):
             pass  # no action here
 
 
-async def mqtt_receiver(client: aiomqtt.Client, door: ElectricDoor) -> None:
-    async for msg in client.messages:
-        payload = msg.payload.decode()
-        topic = str(msg.topic)
-        door.logger.info("[mqtt] receive %s=%s", topic, payload)
-        if topic == f"nuki/{door.nuki_device}/state":
-            door.on_lock_state(NukiLockState(int(payload)))
-        elif topic == f"nuki/{door.nuki_device}/lockAction":
-            door.on_lock_action(NukiLockAction(int(payload)))
-        elif topic == f"nuki/{door.nuki_device}/lockActionEvent":
-            ev = [int(e) for e in payload.split(",")]
-            action = NukiLockAction(ev[0])
-            trigger = NukiLockTrigger(ev[1])
-            door.on_lock_action_event(action, trigger, ev[2], ev[3], bool(ev[4]))
-        elif topic == f"nuki/{door.nuki_device}/doorsensorState":
-            door.on_doorsensor_state(NukiDoorsensorState(int(payload)))
-        elif topic == f"sesami/{door.nuki_device}/request/state":
-            door.on_door_request(DoorRequestState(int(payload)))
+ELECTRIC_DOORS: dict[PushbuttonLogic, type[ElectricDoor]] = {
+    PushbuttonLogic.openhold: ElectricDoorPushbuttonOpenHold,
+    PushbuttonLogic.open: ElectricDoorPushbuttonOpen,
+    PushbuttonLogic.toggle: ElectricDoorPushbuttonToggle,
+}
 
 
-async def activate(logger: Logger, config: SesamiConfig, version: str) -> None:
-    if config.pushbutton == PushbuttonLogic.open:
-        door = ElectricDoorPushbuttonOpen(logger, config, version)
-    elif config.pushbutton == PushbuttonLogic.toggle:
-        door = ElectricDoorPushbuttonToggle(logger, config, version)
-    else:
-        door = ElectricDoorPushbuttonOpenHold(logger, config, version)
-
-    async with aiomqtt.Client(
-        config.mqtt_host, port=config.mqtt_port, username=config.mqtt_username, password=config.mqtt_password
-    ) as client:
-        loop = asyncio.get_running_loop()
-        door.activate(client, loop)
-        await client.subscribe(f"nuki/{door.nuki_device}/state")
-        await client.subscribe(f"nuki/{door.nuki_device}/lockAction")
-        await client.subscribe(f"nuki/{door.nuki_device}/lockActionEvent")
-        await client.subscribe(f"nuki/{door.nuki_device}/doorsensorState")
-        await client.subscribe(f"sesami/{door.nuki_device}/request/state")
-        await mqtt_receiver(client, door)
+def mqtt_on_nuki_lock_state(door: ElectricDoor, payload: bytes) -> None:
+    door.on_lock_state(NUKI_LOCK_STATES.get(payload, NukiLockState.undefined))
 
 
-def main():
+def mqtt_on_nuki_lock_action(door: ElectricDoor, payload: bytes) -> None:
+    try:
+        action = NukiLockAction(int(payload))
+    except ValueError:
+        door.logger.warning("[mqtt] unknown lock action %r", payload)
+        return
+    door.on_lock_action(action)
+
+
+def mqtt_on_nuki_lock_action_event(door: ElectricDoor, payload: bytes) -> None:
+    try:
+        action, trigger, auth_id, code_id, auto_unlock = payload.split(b",")[:5]
+        event = (
+            NukiLockAction(int(action)),
+            NukiLockTrigger(int(trigger)),
+            int(auth_id),
+            int(code_id),
+            bool(int(auto_unlock)),
+        )
+    except ValueError:
+        door.logger.warning("[mqtt] invalid lock action event %r", payload)
+        return
+    door.on_lock_action_event(*event)
+
+
+def mqtt_on_nuki_doorsensor_state(door: ElectricDoor, payload: bytes) -> None:
+    door.on_doorsensor_state(NUKI_DOORSENSOR_STATES.get(payload, NukiDoorsensorState.unknown))
+
+
+def mqtt_on_sesami_request_state(door: ElectricDoor, payload: bytes) -> None:
+    door.on_door_request(DOOR_REQUEST_STATES.get(payload, DoorRequestState.none))
+
+
+async def mqtt_receiver(
+    client: aiomqtt.Client, door: ElectricDoor, handlers: Mapping[str, Callable[[ElectricDoor, bytes], None]]
+) -> None:
+    """Dispatches received MQTT messages to the handler of their topic.
+
+    Arguments:
+    - client: The MQTT client
+    - door: The electric door instance
+    - handlers: The message handlers by (full) topic
+    """
+    async for msg in client.messages:
+        topic = msg.topic.value
+        if door.logger.isEnabledFor(logging.INFO):
+            door.logger.info("[mqtt] receive %s=%s", topic, msg.payload.decode())
+        handler = handlers.get(topic)
+        if handler:
+            handler(door, msg.payload)
+        else:
+            door.logger.warning("[mqtt] unexpected topic %s", topic)
+
+
+async def activate(logger: Logger, config: SesamiConfig, version: str) -> None:
+    # deferred; --help and --version do not need the MQTT stack
+    import aiomqtt
+
+    task = asyncio.current_task()
+    assert task is not None
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, task.cancel)
+
+    door = ELECTRIC_DOORS.get(config.pushbutton, ElectricDoorPushbuttonOpenHold)(logger, config, version)
+
+    logger.info("(gpio) pin factory=%s", type(Device.pin_factory).__name__)
+
+    async with (
+        aiomqtt.Client(
+            config.mqtt_host, port=config.mqtt_port, username=config.mqtt_username, password=config.mqtt_password
+        ) as client,
+        asyncio.TaskGroup() as tg,
+    ):
+        logger.info("[mqtt] connected %s:%i", config.mqtt_host, config.mqtt_port)
+        door.activate(client, tg)
+        handlers = {
+            door.topics["nuki/state"]: mqtt_on_nuki_lock_state,
+            door.topics["nuki/lockAction"]: mqtt_on_nuki_lock_action,
+            door.topics["nuki/lockActionEvent"]: mqtt_on_nuki_lock_action_event,
+            door.topics["nuki/doorsensorState"]: mqtt_on_nuki_doorsensor_state,
+            door.topics["sesami/request/state"]: mqtt_on_sesami_request_state,
+        }
+        await client.subscribe([(topic, 0) for topic in handlers])
+        tg.create_task(mqtt_receiver(client, door, handlers))
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="nuki-sesami",
         description="Open and close an electric door equipped with a Nuki 3.0 pro smart lock",
@@ -574,8 +827,12 @@ def main():
     parser.add_argument("-V", "--verbose", help="be verbose", action="store_true")
     parser.add_argument("-v", "--version", help="print version and exit", action="store_true")
 
-    args = parser.parse_args()
-    version = importlib.metadata.version("nuki-sesami")
+    return parser
+
+
+def main():
+    args = _build_parser().parse_args()
+    version = get_version()
     if args.version:
         print(version)  # noqa: T201
         sys.exit(0)
@@ -590,27 +847,37 @@ def main():
     logger = getlogger("nuki-sesami", logpath, level=logging.DEBUG if args.verbose else logging.INFO)
     config = get_config(cpath)
 
-    logger.info("version          : %s", version)
-    logger.info("prefix           : %s", prefix)
-    logger.info("config-path      : %s", cpath)
-    logger.info("pushbutton       : %s", config.pushbutton.name)
-    logger.info("nuki.device      : %s", config.nuki_device)
-    logger.info("mqtt.host        : %s", config.mqtt_host)
-    logger.info("mqtt.port        : %i", config.mqtt_port)
-    logger.info("mqtt.username    : %s", config.mqtt_username)
-    logger.info("mqtt.password    : %s", "***")
-    logger.info("gpio.pushbutton  : %s", config.gpio_pushbutton)
-    logger.info("gpio.opendoor    : %s", config.gpio_opendoor)
-    logger.info("gpio.openhold    : %s", config.gpio_openhold_mode)
-    logger.info("gpio.openclose   : %s", config.gpio_openclose_mode)
-    logger.info("door-open-time   : %i", config.door_open_time)
-    logger.info("door-close-time  : %i", config.door_close_time)
-    logger.info("lock-unlatch-time: %i", config.lock_unlatch_time)
+    loop_factory = get_loop_factory()
+    logger.info(
+        "startup config: %s",
+        {
+            "version": version,
+            "prefix": prefix,
+            "config-path": cpath,
+            "pushbutton": config.pushbutton.name,
+            "nuki.device": config.nuki_device,
+            "mqtt.host": config.mqtt_host,
+            "mqtt.port": config.mqtt_port,
+            "mqtt.username": config.mqtt_username,
+            "mqtt.password": "***",
+            "gpio.pushbutton": config.gpio_pushbutton,
+            "gpio.opendoor": config.gpio_opendoor,
+            "gpio.openhold": config.gpio_openhold_mode,
+            "gpio.openclose": config.gpio_openclose_mode,
+            "door-open-time": config.door_open_time,
+            "door-close-time": config.door_close_time,
+            "lock-unlatch-time": config.lock_unlatch_time,
+            "event-loop": "uvloop" if loop_factory else "asyncio",
+        },
+    )
 
     try:
-        asyncio.run(activate(logger, config, version))
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(activate(logger, config, version))
     except KeyboardInterrupt:
         logger.info("program terminated; keyboard interrupt")
+    except asyncio.CancelledError:
+        logger.info("program terminated; stopped (SIGTERM)")
     except Exception:
         logger.exception("something went wrong, exception")
 
@@ -1,9 +1,22 @@
+import asyncio
+import functools
+import importlib.metadata
 import logging
 import os
 import subprocess
 import sys
+from collections.abc import Callable
+from enum import IntEnum
 from logging import Logger
 from logging.handlers import RotatingFileHandler
+from typing import TYPE_CHECKING, TypeVar
+
+from nuki_sesami.__about__ import __version__
+
+if TYPE_CHECKING:
+    import aiomqtt
+
+E = TypeVar("E", bound=IntEnum)
 
 
 def is_virtual_env() -> bool:
@@ -64,6 +77,93 @@ def run(cmd: list[str], logger: Logger, check: bool) -> None:
         raise
 
 
+def enum_payloads(enum: type[E]) -> dict[bytes, E]:
+    """Returns a lookup table from (MQTT) payload to enum member.
+
+    Payloads are the ASCII encoded integer values of the enum members, e.g.
+    b'1' for NukiLockState.locked; using the table avoids parsing and
+    validating the payload on every received message.
+
+    Arguments:
+    * enum: integer enumeration type, e.g. NukiLockState
+
+    Returns:
+    * table: dict of payload to enum member
+    """
+    return {str(e.value).encode(): e for e in enum}
+
+
+def payload_bytes(enum: type[E]) -> dict[E, bytes]:
+    """Returns a lookup table from enum member to (MQTT) payload.
+
+    The inverse of enum_payloads; publishing the precomputed bytes avoids
+    converting the integer value to an ASCII encoded payload on every message.
+
+    Arguments:
+    * enum: integer enumeration type, e.g. DoorState
+
+    Returns:
+    * table: dict of enum member to payload
+    """
+    return {e: str(e.value).encode() for e in enum}
+
+
+async def mqtt_publisher(client: "aiomqtt.Client", queue: asyncio.Queue, logger: Logger) -> None:
+    """Publishes queued messages on the MQTT broker in order of arrival.
+
+    Decouples callers, e.g. GPIO callbacks running outside of the event loop,
+    from the actual (network) publish; queueing a message never blocks.
+
+    All messages queued at the time are handed to the client back-to-back and
+    their publish confirmations (e.g. PUBACK for QoS 1) are awaited together,
+    rather than waiting for the confirmation of each message before sending the next.
+    A failed publish is logged and dropped; it does not stop the publisher.
+
+    Arguments:
+    * client: the MQTT client
+    * queue: queue of messages to be published; (topic, payload, qos, retain)
+    * logger: logger instance
+    """
+    while True:
+        messages = [await queue.get()]
+        while not queue.empty():
+            messages.append(queue.get_nowait())
+        results = await asyncio.gather(
+            *[client.publish(topic, payload, qos=qos, retain=retain) for topic, payload, qos, retain in messages],
+            return_exceptions=True,
+        )
+        for (topic, _, _, _), result in zip(messages, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning("[mqtt] failed to publish %s; %s: %s", topic, type(result).__name__, result)
+
+
+def get_loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Returns the uvloop event loop factory when uvloop is installed.
+
+    Returns:
+    * factory: uvloop.new_event_loop, or None to use the default asyncio event loop
+    """
+    try:
+        import uvloop  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+@functools.cache
+def get_version() -> str:
+    """Returns the version of the installed nuki-sesami package.
+
+    The version is only looked up (in the package metadata) once. Falls back to
+    the version of the source tree when the package is not installed.
+    """
+    try:
+        return importlib.metadata.version("nuki-sesami")
+    except importlib.metadata.PackageNotFoundError:
+        return __version__
+
+
+@functools.cache
 def get_prefix() -> str:
     if os.geteuid() == 0:
         return "/"
@@ -72,6 +172,7 @@ def get_prefix() -> str:
     return os.path.join(os.path.expanduser("~"), ".local")
 
 
+@functools.cache
 def get_config_path() -> str:
     if os.geteuid() == 0:
         return "/etc/nuki-sesami"
@@ -1,13 +1,25 @@
+import json
 import os
+import stat
 
-from nuki_sesami.admin import get_systemctl, get_systemd_service_fname
+from nuki_sesami.admin import get_systemctl, get_systemd_service_fname, write_json_file
 
 
 def test_get_systemctl():
-    assert get_systemctl(True) == ["echo", "/usr/bin/systemctl"]
-    assert get_systemctl(False) == ["systemctl"] if os.geteuid() == 0 else ["sudo", "systemctl"]
+    assert get_systemctl(True) == ("echo", "/usr/bin/systemctl")
+    assert get_systemctl(False) == ("systemctl",) if os.geteuid() == 0 else ("sudo", "systemctl")
 
 
 def test_get_systemd_service_fname():
     assert get_systemd_service_fname("/", "nuki-sesami") == "/lib/systemd/system/nuki-sesami.service"
     assert get_systemd_service_fname("/usr", "nuki-sesami-bluez") == "/usr/lib/systemd/system/nuki-sesami-bluez.service"
+
+
+def test_write_json_file(tmp_path):
+    fname = os.path.join(tmp_path, "nuki-sesami", "auth.json")
+    write_json_file(fname, {"username": "sesami", "password": "secret"}, stat.S_IRUSR)
+    write_json_file(fname, {"username": "sesami", "password": "changed"}, stat.S_IRUSR)
+    with open(fname) as f:
+        assert json.load(f) == {"username": "sesami", "password": "changed"}
+    assert stat.S_IMODE(os.stat(fname).st_mode) == stat.S_IRUSR
+    assert os.listdir(os.path.dirname(fname)) == ["auth.json"]
@@ -0,0 +1,136 @@
+import logging
+
+import pytest
+
+from nuki_sesami.bluetooth import SesamiBluetoothAgent, SesamiBluetoothProtocol
+from nuki_sesami.config import SesamiConfig
+
+
+@pytest.fixture
+def config():
+    return SesamiConfig(
+        {
+            "nuki": {"device": "12345678"},
+            "mqtt": {"host": "localhost", "port": 1883},
+            "bluetooth": {"macaddr": "11:22:33:44:55:66", "channel": 1},
+            "gpio": {"pushbutton": 2, "opendoor": 26, "openhold-mode": 20, "openclose-mode": 21},
+            "pushbutton": "openhold",
+        },
+        {"username": "sesami", "password": "secret"},
+    )
+
+
+class Transport:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Agent:
+    def __init__(self):
+        self.logger = logging.getLogger("test")
+        self.requests = []
+        self.disconnected = []
+
+    def client_connected(self, transport):
+        pass
+
+    def client_disconnected(self, transport, exc):
+        self.disconnected.append(transport)
+
+    def process_request(self, data):
+        self.requests.append(data)
+
+
+def receive(protocol, data):
+    buffer = protocol.get_buffer(-1)
+    buffer[: len(data)] = data
+    protocol.buffer_updated(len(data))
+
+
+def test_protocol_split_request():
+    agent = Agent()
+    protocol = SesamiBluetoothProtocol(agent)
+    protocol.connection_made(Transport())
+    receive(protocol, b'{"method": "se')
+    assert agent.requests == []
+    receive(protocol, b't"}\n')
+    assert agent.requests == [b'{"method": "set"}']
+
+
+def test_protocol_multiple_requests():
+    agent = Agent()
+    protocol = SesamiBluetoothProtocol(agent)
+    protocol.connection_made(Transport())
+    receive(protocol, b"a\nbc\n\nde")
+    assert agent.requests == [b"a", b"bc", b""]
+    receive(protocol, b"f\n")
+    assert agent.requests == [b"a", b"bc", b"", b"def"]
+
+
+def test_protocol_buffer_growth():
+    agent = Agent()
+    protocol = SesamiBluetoothProtocol(agent, bufsize=4, maxsize=16)
+    transport = Transport()
+    protocol.connection_made(transport)
+    receive(protocol, b"abcd")
+    assert len(protocol.get_buffer(-1)) == 4
+    receive(protocol, b"efg\n")
+    assert agent.requests == [b"abcdefg"]
+    assert not transport.closed
+
+
+def test_protocol_request_too_large(caplog):
+    agent = Agent()
+    protocol = SesamiBluetoothProtocol(agent, bufsize=4, maxsize=8)
+    transport = Transport()
+    protocol.connection_made(transport)
+    receive(protocol, b"abcd")
+    receive(protocol, b"efgh")
+    assert len(protocol.get_buffer(-1)) == 8
+    assert transport.closed
+    assert "request exceeds 8 bytes" in caplog.text
+    protocol.connection_lost(None)
+    assert agent.disconnected == [transport]
+    assert agent.requests == []
+
+
+def published(agent):
+    queue = agent._publish_queue
+    return [queue.get_nowait() for _ in range(queue.qsize())]
+
+
+def test_process_request(config):
+    agent = SesamiBluetoothAgent(logging.getLogger("test"), config, "0.0.0")
+    agent.process_request(b'{"jsonrpc":"2.0","method":"set","params":{"door_request_state":2}}')
+    assert published(agent) == [("sesami/12345678/request/state", b"2", 0, False)]
+
+
+def test_process_request_ignored(config, caplog):
+    agent = SesamiBluetoothAgent(logging.getLogger("test"), config, "0.0.0")
+    agent.process_request(b'{"jsonrpc":"2.0","method":"alive"}')
+    agent.process_request(b'{"jsonrpc":"2.0","method":"get","params":{"door_request_state":"set"}}')
+    agent.process_request(b'{"jsonrpc":"2.0","method":"set","params":{"status":1}}')
+    agent.process_request(b"")
+    assert published(agent) == []
+    assert "failed to process request" not in caplog.text
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        b'{"method":"set", params}',
+        b'{"params":{"door_request_state":2},"id":"set"}',
+        b'{"method":"set","params":["door_request_state"]}',
+        b'{"method":"set","params":"door_request_state"}',
+        b'{"method":"set","params":{"door_request_state":42}}',
+        b'["set"]',
+    ],
+)
+def test_process_request_malformed(config, caplog, request_):
+    agent = SesamiBluetoothAgent(logging.getLogger("test"), config, "0.0.0")
+    agent.process_request(request_)
+    assert published(agent) == []
+    assert "failed to process request" in caplog.text
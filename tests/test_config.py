@@ -1,4 +1,6 @@
-from nuki_sesami.config import SesamiConfig
+import json
+
+from nuki_sesami.config import SesamiConfig, get_config
 from nuki_sesami.state import PushbuttonLogic
 
 
@@ -50,3 +52,25 @@ def test_sesami_config():
     assert sesami_config.door_open_time == 40
     assert sesami_config.door_close_time == 10
     assert sesami_config.lock_unlatch_time == 4
+
+
+def test_get_config(tmp_path):
+    config = {
+        "nuki": {"device": "12345678"},
+        "mqtt": {"host": "mqtt.example.com", "port": 1883},
+        "bluetooth": {"macaddr": "11:22:33:44:55:66", "channel": 1, "backlog": 16},
+        "gpio": {"pushbutton": 17, "opendoor": 18, "openhold-mode": 22, "openclose-mode": 23},
+        "pushbutton": PushbuttonLogic.open.name,
+    }
+    (tmp_path / "config.json").write_text(json.dumps(config))
+    (tmp_path / "auth.json").write_text(json.dumps({"username": "mqttuser", "password": "mqttpass"}))
+
+    sesami_config = get_config(str(tmp_path))
+
+    assert sesami_config.nuki_device == "12345678"
+    assert sesami_config.mqtt_password == "mqttpass"
+    assert sesami_config.bluetooth_backlog == 16
+    assert sesami_config.pushbutton == PushbuttonLogic.open
+    assert sesami_config.door_open_time == 40
+    assert sesami_config.door_close_time == 10
+    assert sesami_config.lock_unlatch_time == 4
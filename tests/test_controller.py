@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import logging
+import math
+
+import pytest
+
+from nuki_sesami.config import SesamiConfig
+from nuki_sesami.controller import (
+    Device,
+    ElectricDoorPushbuttonOpenHold,
+    mqtt_on_nuki_lock_action,
+    mqtt_on_nuki_lock_action_event,
+    mqtt_publish_sesami_relay_state,
+)
+from nuki_sesami.lock import NukiLockAction, NukiLockState, NukiLockTrigger
+from nuki_sesami.state import DoorOpenTrigger, DoorRequestState, DoorState
+
+
+class MqttClient:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published.append((topic, payload, retain))
+
+
+class Deactivate(Exception):
+    pass
+
+
+@contextlib.asynccontextmanager
+async def activated(door, client):
+    """Runs the door in its own task group; leaving the context cancels only the door's tasks."""
+    try:
+        async with asyncio.TaskGroup() as tg:
+            door.activate(client, tg)
+            yield
+            raise Deactivate
+    except* Deactivate:
+        pass
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setenv("GPIOZERO_PIN_FACTORY", "mock")
+    yield SesamiConfig(
+        {
+            "nuki": {"device": "12345678"},
+            "mqtt": {"host": "localhost", "port": 1883},
+            "bluetooth": {"macaddr": "11:22:33:44:55:66", "channel": 1},
+            "gpio": {"pushbutton": 2, "opendoor": 26, "openhold-mode": 20, "openclose-mode": 21},
+            "pushbutton": "openhold",
+            "door-open-time": 1,
+            "door-close-time": 0.3,
+            "lock-unlatch-time": 1,
+        },
+        {"username": "sesami", "password": "secret"},
+    )
+    if Device.pin_factory:
+        Device.pin_factory.close()
+        Device.pin_factory = None
+
+
+def test_timed_door_closed_openhold(config):
+    async def run():
+        door = ElectricDoorPushbuttonOpenHold(logging.getLogger("test"), config, "0.0.0")
+        async with activated(door, MqttClient()):
+            door.on_pushbutton_pressed()
+            await asyncio.sleep(0.1)
+            door.on_lock_state(NukiLockState.unlatched)
+            await asyncio.sleep(0.6)
+            assert door.state == DoorState.openhold
+            assert door.gpio_openhold_set
+
+            door.close()
+            assert not door.gpio_openhold_set
+            await asyncio.sleep(0.6)
+            assert door.state == DoorState.closed
+
+    asyncio.run(run())
+
+
+def queued(door):
+    queue = door._publish_queue
+    return [queue.get_nowait() for _ in range(queue.qsize())]
+
+
+def test_mqtt_publish_sesami_relay_state(config):
+    door = ElectricDoorPushbuttonOpenHold(logging.getLogger("test"), config, "0.0.0")
+    mqtt_publish_sesami_relay_state(door, "openhold", 1)
+    mqtt_publish_sesami_relay_state(door, "openhold", 1)
+    assert queued(door) == [("sesami/12345678/relay/openhold", b"1", 0, True)]
+    mqtt_publish_sesami_relay_state(door, "openhold", 0)
+    mqtt_publish_sesami_relay_state(door, "openclose", 0)
+    assert queued(door) == [
+        ("sesami/12345678/relay/openhold", b"0", 0, True),
+        ("sesami/12345678/relay/openclose", b"0", 0, True),
+    ]
+
+
+def test_mqtt_on_nuki_lock_action(config, caplog):
+    door = ElectricDoorPushbuttonOpenHold(logging.getLogger("test"), config, "0.0.0")
+    mqtt_on_nuki_lock_action(door, b"3")
+    assert door._nuki_action == NukiLockAction.unlatch
+    for payload in (b"", b"abc", b"42"):
+        mqtt_on_nuki_lock_action(door, payload)
+        assert door._nuki_action == NukiLockAction.unlatch
+    assert caplog.text.count("unknown lock action") == 3
+
+
+def test_mqtt_on_nuki_lock_action_event(config, caplog):
+    door = ElectricDoorPushbuttonOpenHold(logging.getLogger("test"), config, "0.0.0")
+    mqtt_on_nuki_lock_action_event(door, b"3,0,123,0,1,extra")
+    event = door._nuki_action_event
+    assert event is not None
+    assert event.action == NukiLockAction.unlatch
+    assert event.trigger == NukiLockTrigger.system_bluetooth
+    for payload in (b"1,0,123", b"garbage", b"1,0,x,0,1", b"42,0,123,0,1"):
+        mqtt_on_nuki_lock_action_event(door, payload)
+        assert door._nuki_action_event is event
+    assert caplog.text.count("invalid lock action event") == 4
+
+
+def test_state_publish_coalesced(config):
+    async def run():
+        door = ElectricDoorPushbuttonOpenHold(logging.getLogger("test"), config, "0.0.0")
+        client = MqttClient()
+        async with activated(door, client):
+            await asyncio.sleep(0.1)
+            client.published.clear()
+            door.state = DoorState.opened
+            door.state = DoorState.openhold
+            door.openhold(DoorOpenTrigger.lock_unlatched)
+            await asyncio.sleep(0.1)
+        return client.published
+
+    assert asyncio.run(run()) == [
+        ("sesami/12345678/relay/openhold", b"1", True),
+        ("sesami/12345678/relay/openclose", b"0", True),
+        ("sesami/12345678/state", b"2", True),
+        ("sesami/12345678/mode", b"1", True),
+    ]
+
+
+def test_unlatch_coalesced(config):
+    async def run():
+        door = ElectricDoorPushbuttonOpenHold(logging.getLogger("test"), config, "0.0.0")
+        client = MqttClient()
+        async with activated(door, client):
+            door.on_door_request(DoorRequestState.open)
+            door.on_door_request(DoorRequestState.open)
+            door.on_door_request(DoorRequestState.openhold)
+            door.unlatch()
+            await asyncio.sleep(0.1)
+            unlatched = [msg for msg in client.published if msg[0] == "nuki/12345678/lockAction"]
+            assert unlatched == [("nuki/12345678/lockAction", b"3", False)]
+
+            door.on_lock_state(NukiLockState.unlatched)
+            assert door._lock_unlatch_requested == -math.inf
+            door.unlatch()
+            await asyncio.sleep(0.1)
+            unlatched = [msg for msg in client.published if msg[0] == "nuki/12345678/lockAction"]
+            assert len(unlatched) == 2
+
+    asyncio.run(run())
+
+
+def test_opendoor_pulse(config):
+    async def run():
+        door = ElectricDoorPushbuttonOpenHold(logging.getLogger("test"), config, "0.0.0")
+        client = MqttClient()
+        async with activated(door, client):
+            await asyncio.sleep(0.1)
+            assert ("sesami/12345678/relay/opendoor", b"0", True) in client.published
+            client.published.clear()
+
+            door.opendoor_pulse(0.2)
+            await asyncio.sleep(0.1)
+            assert door._opendoor.value == 1
+            door.opendoor_pulse(0.2)  # restarts the pulse without publishing again
+            await asyncio.sleep(0.15)
+            assert door._opendoor.value == 1
+            assert client.published == [("sesami/12345678/relay/opendoor", b"1", False)]
+            await asyncio.sleep(0.1)
+            assert door._opendoor.value == 0
+            assert client.published == [
+                ("sesami/12345678/relay/opendoor", b"1", False),
+                ("sesami/12345678/relay/opendoor", b"0", False),
+            ]
+
+    asyncio.run(run())
@@ -1,7 +1,31 @@
+import asyncio
+import logging
 import os
 import sys
+import types
 
-from nuki_sesami.util import get_config_path, get_prefix, is_virtual_env
+from nuki_sesami.__about__ import __version__
+from nuki_sesami.lock import NukiLockState
+from nuki_sesami.util import (
+    enum_payloads,
+    get_config_path,
+    get_loop_factory,
+    get_prefix,
+    get_version,
+    is_virtual_env,
+    mqtt_publisher,
+    payload_bytes,
+)
+
+
+class FailingMqttClient:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic, payload=None, qos=0, retain=False):
+        if topic == "fail":
+            raise ConnectionError("publish failed")
+        self.published.append((topic, payload))
 
 
 def test_is_virtual_env():
@@ -26,3 +50,54 @@ def test_get_config_path():
         assert path == os.path.join(sys.prefix, "etc", "nuki-sesami")
     else:
         assert path == os.path.join(os.path.expanduser("~"), ".config", "nuki-sesami")
+
+
+def test_enum_payloads():
+    payloads = enum_payloads(NukiLockState)
+    assert payloads[b"1"] == NukiLockState.locked
+    assert payloads[b"255"] == NukiLockState.undefined
+    assert len(payloads) == len(NukiLockState)
+    assert b"8" not in payloads
+
+
+def test_payload_bytes():
+    payloads = payload_bytes(NukiLockState)
+    assert payloads[NukiLockState.locked] == b"1"
+    assert payloads[NukiLockState.undefined] == b"255"
+    assert enum_payloads(NukiLockState) == {v: k for k, v in payloads.items()}
+
+
+def test_mqtt_publisher_failure(caplog):
+    async def run():
+        client = FailingMqttClient()
+        queue = asyncio.Queue()
+        task = asyncio.create_task(mqtt_publisher(client, queue, logging.getLogger("test")))
+        queue.put_nowait(("a", b"1", 0, False))
+        queue.put_nowait(("fail", b"2", 0, False))
+        queue.put_nowait(("b", b"3", 0, False))
+        await asyncio.sleep(0)
+        queue.put_nowait(("fail", b"4", 0, False))
+        queue.put_nowait(("c", b"5", 0, False))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        task.cancel()
+        return client.published
+
+    with caplog.at_level(logging.WARNING):
+        assert asyncio.run(run()) == [("a", b"1"), ("b", b"3"), ("c", b"5")]
+    assert caplog.text.count("failed to publish fail") == 2
+
+
+def test_get_loop_factory(monkeypatch):
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    assert get_loop_factory() is None
+
+
+def test_get_loop_factory_uvloop(monkeypatch):
+    uvloop = types.SimpleNamespace(new_event_loop=asyncio.new_event_loop)
+    monkeypatch.setitem(sys.modules, "uvloop", uvloop)
+    assert get_loop_factory() is uvloop.new_event_loop
+
+
+def test_get_version():
+    assert get_version() == __version__